@@ -65,7 +65,7 @@ class AudioFormat(Gtk.Box):
             self._brate_label.set_text(brate)
 
     def _on_song_changed(self, *args):
-        current_song = self._client.currentsong()
+        current_song = self._client.get_current_song()
         if current_song:
             file_type = current_song["file"].split(".")[-1].split("/")[0].upper()
             self._separator_label.set_text(" kb∕s • ")
@@ -1,6 +1,9 @@
 import gi
+import os
+import queue
 import threading
 from gettext import gettext as _
+from mpd import base as MPDBase
 
 from mpdevil.constants import FALLBACK_COVER
 from mpdevil.decorators import main_thread_function
@@ -21,24 +24,18 @@ class AlbumLoadingThread(threading.Thread):
         self._artist = artist
         self._genre = genre
 
-    def _get_albums(self):
-        for albumartist, albumartistsort in self._artists:
-            albums = main_thread_function(self._client.list)(
-                "album",
-                "albumartist",
-                albumartist,
-                "albumartistsort",
-                albumartistsort,
-                *self._genre_filter,
-                "group",
-                "date",
-                "group",
-                "albumsort",
-            )
-            for album in albums:
-                album["albumartist"] = albumartist
-                album["albumartistsort"] = albumartistsort
-                yield album
+    def _get_albums(self, client):
+        if self._artist is None:
+            return self._client.get_all_albums(self._genre, connection=client)
+        albumartist, albumartistsort = self._artist
+        albums = self._client.get_albums(
+            albumartist, albumartistsort, self._genre, client
+        )
+        # responses are cached, copy before modifying
+        return [
+            {**album, "albumartist": albumartist, "albumartistsort": albumartistsort}
+            for album in albums
+        ]
 
     def set_callback(self, callback):
         self._callback = callback
@@ -58,23 +55,23 @@ class AlbumLoadingThread(threading.Thread):
             self._iconview.set_markup_column(2)  # show artist names
         else:
             self._iconview.set_markup_column(1)  # hide artist names
-        if self._genre is None:
-            self._genre_filter = ()
-        else:
-            self._genre_filter = ("genre", self._genre)
-        if self._artist is None:
-            self._artists = self._client.get_artists(self._genre)
-        else:
-            self._artists = [self._artist]
         super().start()
 
     def run(self):
+        try:
+            with self._client.background_connection() as client:
+                self._load(client)
+        except (MPDBase.MPDError, OSError) as e:
+            print(e)
+        self._exit()
+
+    def _load(self, client):
         # temporarily display all albums with fallback cover
         fallback_cover = GdkPixbuf.Pixbuf.new_from_file_at_size(
             FALLBACK_COVER, self._cover_size, self._cover_size
         )
-        add = main_thread_function(self._store.append)
-        for i, album in enumerate(self._get_albums()):
+        rows = []
+        for album in self._get_albums(client):
             # album label
             if album["date"]:
                 display_label = f"<b>{GLib.markup_escape_text(album['album'])}</b> ({GLib.markup_escape_text(album['date'])})"
@@ -83,8 +80,7 @@ class AlbumLoadingThread(threading.Thread):
             display_label_artist = (
                 f"{display_label}\n{GLib.markup_escape_text(album['albumartist'])}"
             )
-            # add album
-            add(
+            rows.append(
                 [
                     fallback_cover,
                     display_label,
@@ -96,11 +92,13 @@ class AlbumLoadingThread(threading.Thread):
                     album["date"],
                 ]
             )
-            if i % 10 == 0:
-                if self._stop_flag:
-                    self._exit()
-                    return
-                GLib.idle_add(self._progress_bar.pulse)
+        # add albums in batches to keep the ui responsive
+        batch_size = 1000
+        for i in range(0, len(rows), batch_size):
+            if self._stop_flag:
+                return
+            self._append_rows(rows[i : i + batch_size])
+            GLib.idle_add(self._progress_bar.pulse)
         # sort model
         if main_thread_function(self._settings.get_boolean)("sort-albums-by-year"):
             main_thread_function(self._store.set_sort_column_id)(
@@ -111,63 +109,18 @@ class AlbumLoadingThread(threading.Thread):
                 6, Gtk.SortType.ASCENDING
             )
         GLib.idle_add(self._iconview.set_model, self._store)
-        # load covers
-        total = 2 * len(self._store)
-
-        @main_thread_function
-        def get_cover(row):
-            if self._stop_flag:
-                return None
-            else:
-                self._client.restrict_tagtypes("albumartist", "album")
-                song = self._client.find(
-                    "albumartist",
-                    row[3],
-                    "albumartistsort",
-                    row[4],
-                    "album",
-                    row[5],
-                    "albumsort",
-                    row[6],
-                    "date",
-                    row[7],
-                    "window",
-                    "0:1",
-                )[0]
-                self._client.tagtypes("all")
-                return self._client.get_cover(song)
-
-        covers = []
-        for i, row in enumerate(self._store):
-            cover = get_cover(row)
-            if cover is None:
-                self._exit()
-                return
-            covers.append(cover)
-            GLib.idle_add(self._progress_bar.set_fraction, (i + 1) / total)
-        treeiter = self._store.get_iter_first()
-        i = 0
 
-        def set_cover(treeiter, cover):
-            if self._store.iter_is_valid(treeiter):
-                self._store.set_value(treeiter, 0, cover)
-
-        while treeiter is not None:
-            if self._stop_flag:
-                self._exit()
-                return
-            cover = covers[i].get_pixbuf(self._cover_size)
-            GLib.idle_add(set_cover, treeiter, cover)
-            GLib.idle_add(self._progress_bar.set_fraction, 0.5 + (i + 1) / total)
-            i += 1
-            treeiter = self._store.iter_next(treeiter)
-        self._exit()
+    @main_thread_function
+    def _append_rows(self, rows):
+        for row in rows:
+            self._store.insert_with_valuesv(-1, range(8), row)
 
     def _exit(self):
         def callback():
             self._settings.set_property("cursor-watch", False)
             self._progress_bar.hide()
             self._progress_bar.set_fraction(0)
+            self._iconview.load_visible_covers()
             if self._callback is not None:
                 self._callback()
             return False
@@ -175,6 +128,143 @@ class AlbumLoadingThread(threading.Thread):
         GLib.idle_add(callback)
 
 
+class CoverLoadingThread(threading.Thread):
+    # fetches covers of the requested rows, a new request replaces the current one
+    def __init__(self, client, callback, max_in_flight=8):
+        super().__init__(daemon=True)
+        self._client = client
+        self._callback = callback
+        self._condition = threading.Condition()
+        self._request = None
+        # rows of the last request by album tags, covers of other rows are dropped
+        self._wanted = {}
+        self._generation = None
+        self._cover_size = None
+        self._in_flight = set()  # tags of fetched covers which are not delivered yet
+        # limits the cover bytes held in memory, held from fetch until decoded
+        self._slots = threading.BoundedSemaphore(max_in_flight)
+        self._covers = queue.Queue()  # fetched covers waiting to be decoded
+        # pixbuf decoders release the GIL, so covers are decoded on all cores
+        workers = min(os.cpu_count() or 1, max_in_flight)
+        self._decoders = [
+            threading.Thread(target=self._decode, daemon=True) for _ in range(workers)
+        ]
+        self._decoded = []  # waiting to be handed to the main thread
+        self._decoded_lock = threading.Lock()
+
+    def start(self):
+        for decoder in self._decoders:
+            decoder.start()
+        super().start()
+
+    def request(self, generation, cover_size, rows):
+        with self._condition:
+            self._request = rows
+            self._wanted = {tuple(row[1:]): row[0] for row in rows}
+            self._generation = generation
+            self._cover_size = cover_size
+            self._condition.notify()
+
+    def run(self):
+        while True:
+            with self._condition:
+                while self._request is None:
+                    self._condition.wait()
+                # covers which are already on their way are not fetched again
+                tags = [
+                    tuple(row[1:])
+                    for row in self._request
+                    if tuple(row[1:]) not in self._in_flight
+                ]
+                self._request = None
+            if not tags:
+                continue
+            try:
+                with self._client.background_connection() as client:
+                    self._load(client, tags)
+            except (MPDBase.MPDError, OSError) as e:
+                print(e)
+
+    def _load(self, client, tags):
+        songs = client.find_first(
+            [
+                (
+                    "albumartist",
+                    albumartist,
+                    "albumartistsort",
+                    albumartistsort,
+                    "album",
+                    album,
+                    "albumsort",
+                    albumsort,
+                    "date",
+                    date,
+                )
+                for albumartist, albumartistsort, album, albumsort, date in tags
+            ],
+            tags=("albumartist", "album"),
+        )
+        for album, song in zip(tags, songs):
+            self._slots.acquire()  # blocks while the decoders are behind
+            with self._condition:
+                if album not in self._wanted:  # scrolled out of view
+                    self._slots.release()
+                    continue
+                self._in_flight.add(album)
+            try:
+                if song is None:
+                    cover = None
+                else:
+                    cover = self._client.get_cover(song, client)
+            except:
+                with self._condition:
+                    self._in_flight.discard(album)
+                self._slots.release()
+                raise
+            self._covers.put((album, cover))
+
+    def _decode(self):
+        while True:
+            album, cover = self._covers.get()
+            passed_on = False
+            try:
+                passed_on = self._decode_cover(album, cover)
+            except Exception as e:  # a broken cover must not stop the decoder
+                print(e)
+            finally:
+                self._slots.release()
+                if not passed_on:
+                    with self._condition:
+                        self._in_flight.discard(album)
+
+    def _decode_cover(self, album, cover):  # returns whether the cover was passed on
+        with self._condition:
+            wanted = album in self._wanted
+            cover_size = self._cover_size
+        if wanted and cover is not None:
+            cover = cover.get_pixbuf(cover_size)
+        with self._condition:
+            treeiter = self._wanted.pop(album, None)
+            generation = self._generation
+        if treeiter is None:  # row is no longer requested
+            return False
+        with self._decoded_lock:
+            self._decoded.append((album, generation, treeiter, cover))
+            if len(self._decoded) == 1:  # no flush pending
+                GLib.idle_add(self._flush)
+        return True
+
+    def _flush(self):
+        with self._decoded_lock:
+            decoded = self._decoded
+            self._decoded = []
+        for album, generation, treeiter, cover in decoded:
+            self._callback(generation, treeiter, cover)
+        with self._condition:  # rows are marked as loaded now
+            self._in_flight.difference_update(album for album, *rest in decoded)
+        return False
+
+
 class AlbumList(Gtk.IconView):
     def __init__(self, client, settings, artist_list):
         super().__init__(
@@ -187,8 +277,10 @@ class AlbumList(Gtk.IconView):
         self._client = client
         self._artist_list = artist_list
 
-        # cover, display_label, display_label_artist, albumartist, albumartistsort, album, albumsort, date
-        self._store = Gtk.ListStore(GdkPixbuf.Pixbuf, str, str, str, str, str, str, str)
+        # cover, display_label, display_label_artist, albumartist, albumartistsort, album, albumsort, date, cover loaded
+        self._store = Gtk.ListStore(
+            GdkPixbuf.Pixbuf, str, str, str, str, str, str, str, bool
+        )
         self._store.set_default_sort_func(lambda *args: 0)
         self.set_model(self._store)
 
@@ -208,8 +300,16 @@ class AlbumList(Gtk.IconView):
             None,
             None,
         )
+        # covers are only loaded near the visible part of the list
+        self._cover_generation = 0  # increased when the store is cleared
+        self._cover_request_id = None
+        self._vadjustment = None
+        self._vadjustment_handlers = []
+        self._visible_covers_thread = CoverLoadingThread(self._client, self._set_cover)
+        self._visible_covers_thread.start()
 
         # connect
+        self.connect("notify::vadjustment", self._on_vadjustment_changed)
         self.connect("item-activated", self._on_item_activated)
         self.connect("button-press-event", self._on_button_press_event)
         self._client.emitter.connect("disconnected", self._on_disconnected)
@@ -219,7 +319,54 @@ class AlbumList(Gtk.IconView):
         self._artist_list.connect("item-selected", self._refresh)
         self._artist_list.connect("clear", self._clear)
 
+    def _on_vadjustment_changed(self, *args):
+        for handler in self._vadjustment_handlers:
+            self._vadjustment.disconnect(handler)
+        self._vadjustment = self.get_vadjustment()
+        if self._vadjustment is None:
+            self._vadjustment_handlers = []
+        else:
+            self._vadjustment_handlers = [
+                self._vadjustment.connect("value-changed", self.load_visible_covers),
+                self._vadjustment.connect("changed", self.load_visible_covers),
+            ]
+
+    def load_visible_covers(self, *args):
+        if self._cover_request_id is None:  # limit requests while scrolling
+            self._cover_request_id = GLib.timeout_add(100, self._request_covers)
+
+    def _request_covers(self):
+        self._cover_request_id = None
+        visible_range = self.get_visible_range()
+        if visible_range is None:
+            return False
+        start = visible_range[0].get_indices()[0]
+        end = visible_range[1].get_indices()[0] + 1
+        band = end - start  # one page before and after the visible albums
+        length = len(self._store)
+        rows = []
+        for i in (
+            *range(start, end),
+            *range(end, min(end + band, length)),
+            *range(max(start - band, 0), start),
+        ):
+            row = self._store[i]
+            if not row[8]:
+                rows.append((row.iter, *row[3:8]))
+        self._visible_covers_thread.request(
+            self._cover_generation, self._settings.get_int("album-cover"), rows
+        )
+        return False
+
+    def _set_cover(self, generation, treeiter, cover):
+        if generation == self._cover_generation:
+            if cover is not None:
+                self._store.set_value(treeiter, 0, cover)
+            self._store.set_value(treeiter, 8, True)
+        return False
+
     def _workaround_clear(self):
+        self._cover_generation += 1
         self._store.clear()
         # workaround (scrollbar still visible after clear)
         self.set_model(None)
@@ -238,7 +385,7 @@ class AlbumList(Gtk.IconView):
 
     def scroll_to_current_album(self):
         def callback():
-            song = self._client.currentsong()
+            song = self._client.get_current_song()
             album = song["album"][0]
             self.unselect_all()
             row_num = len(self._store)
@@ -276,6 +423,7 @@ class AlbumList(Gtk.IconView):
                 artist,
                 genre,
             )
+            self._cover_generation += 1
             self._cover_thread.start()
 
         if self._cover_thread.is_alive():
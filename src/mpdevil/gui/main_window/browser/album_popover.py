@@ -1,4 +1,4 @@
-from gettext import gettext as _
+from gettext import gettext as _, ngettext
 import gi
 from mpdevil.gui.main_window.songs_window import SongsWindow
 from mpdevil.mpd_client_wrapper import Duration
@@ -13,6 +13,7 @@ class AlbumPopover(Gtk.Popover):
         self._client = client
         self._settings = settings
         self._rect = Gdk.Rectangle()
+        self._tag_filter = None
 
         # songs window
         # (track, title (artist), duration, file, search text)
@@ -62,7 +63,6 @@ class AlbumPopover(Gtk.Popover):
         self.set_pointing_to(self._rect)
         self.set_relative_to(widget)
         self._scroll.set_max_content_height(4 * widget.get_allocated_height() // 7)
-        self._store.clear()
         tag_filter = (
             "albumartist",
             albumartist,
@@ -75,25 +75,31 @@ class AlbumPopover(Gtk.Popover):
             "date",
             date,
         )
-        count = self._client.count(*tag_filter)
+        self._tag_filter = tag_filter
+        self._client.run_async(self._get_album, self._open_album, tag_filter)
+
+    def _get_album(self, client, tag_filter):  # runs in worker thread
+        count = client.count(*tag_filter)
+        songs = client.find(*tag_filter, tags=("track", "title", "artist"))
+        return (tag_filter, count, songs)
+
+    def _open_album(self, result):
+        tag_filter, count, songs = result
+        if tag_filter != self._tag_filter:  # popover was reopened in the meantime
+            return
+        albumartist = tag_filter[1]
+        self._store.clear()
         duration = str(Duration(float(count["playtime"])))
         length = int(count["songs"])
         text = ngettext(
             "{number} song ({duration})", "{number} songs ({duration})", length
         ).format(number=length, duration=duration)
         self._column_title.set_title(" • ".join([_("Title"), text]))
-        self._client.restrict_tagtypes("track", "title", "artist")
-        songs = self._client.find(*tag_filter)
-        self._client.tagtypes("all")
         for song in songs:
             track = song["track"][0]
             title = song["title"][0]
-            # only show artists =/= albumartist
-            try:
-                song["artist"].remove(albumartist)
-            except ValueError:
-                pass
-            artist = str(song["artist"])
+            # only show artists =/= albumartist (songs are cached, don't modify them)
+            artist = ", ".join(a for a in song["artist"] if a != albumartist)
             if artist == albumartist or not artist:
                 title_artist = f"<b>{GLib.markup_escape_text(title)}</b>"
             else:
@@ -76,7 +76,7 @@ class ArtistList(SelectionList):
         if genre is not None:
             self.select_all()
         else:
-            song = self._client.currentsong()
+            song = self._client.get_current_song()
             if song:
                 artist = (song["albumartist"][0], song["albumartistsort"][0])
                 self.select(artist)
@@ -45,7 +45,7 @@ class Browser(Gtk.Paned):
         self.pack2(self.paned1, True, False)
 
     def back_to_current_album(self, force=False):
-        song = self._client.currentsong()
+        song = self._client.get_current_song()
         if song:
             artist, genre = self._artist_list.get_artist_selected()
             # deactivate genre filter to show all artists (if needed)
@@ -16,7 +16,7 @@ class GenreList(SelectionList):
         self.select_all()
 
     def _refresh(self, *args):
-        l = self._client.comp_list("genre")
+        l = self._client.get_genres()
         self.set_items(list(zip(l, l)))
         self.select_all()
 
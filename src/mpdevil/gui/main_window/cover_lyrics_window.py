@@ -33,7 +33,7 @@ class MainCover(Gtk.Image):
         )
 
     def _refresh(self, *args):
-        song = self._client.currentsong()
+        song = self._client.get_current_song()
         if song:
             self.set_from_pixbuf(
                 self._client.get_cover(song).get_pixbuf(
@@ -78,7 +78,7 @@ class CoverEventBox(Gtk.EventBox):
                 window.begin_move_drag(1, event.x_root, event.y_root, Gdk.CURRENT_TIME)
         else:
             if self._client.connected():
-                song = self._client.currentsong()
+                song = self._client.get_current_song()
                 if song:
                     tags = (
                         song["albumartist"][0],
@@ -134,7 +134,7 @@ class LyricsWindow(Gtk.ScrolledWindow):
         self.add(self._text_view)
 
     def enable(self, *args):
-        current_song = self._client.currentsong()
+        current_song = self._client.get_current_song()
         if current_song:
             if current_song["file"] != self._displayed_song_file:
                 self._refresh()
@@ -197,7 +197,7 @@ class LyricsWindow(Gtk.ScrolledWindow):
         GLib.idle_add(self._text_buffer.set_text, text, -1)
 
     def _refresh(self, *args):
-        current_song = self._client.currentsong()
+        current_song = self._client.get_current_song()
         if current_song:
             self._displayed_song_file = current_song["file"]
             update_thread = threading.Thread(
@@ -178,6 +178,10 @@ class MainWindow(Gtk.ApplicationWindow):
         self._client.emitter.connect("current_song", self._on_song_changed)
         self._client.emitter.connect("disconnected", self._on_disconnected)
         self._client.emitter.connect("reconnected", self._on_reconnected)
+        self._client.emitter.connect("connection_lost", self._on_connection_lost)
+        self._client.emitter.connect(
+            "connection_restored", self._on_connection_restored
+        )
         # auto save window state and size
         self.connect("size-allocate", self._on_size_allocate)
         self._settings.bind("maximize", self, "is-maximized", Gio.SettingsBindFlags.SET)
@@ -204,10 +208,10 @@ class MainWindow(Gtk.ApplicationWindow):
         action_bar.pack_start(audio)
         action_bar.pack_start(playback_options)
         action_bar.pack_start(volume_button)
-        vbox = Gtk.Box(orientation=Gtk.Orientation.VERTICAL)
-        vbox.pack_start(self._paned2, True, True, 0)
-        vbox.pack_start(action_bar, False, False, 0)
-        overlay = Gtk.Overlay(child=vbox)
+        self._vbox = Gtk.Box(orientation=Gtk.Orientation.VERTICAL)
+        self._vbox.pack_start(self._paned2, True, True, 0)
+        self._vbox.pack_start(action_bar, False, False, 0)
+        overlay = Gtk.Overlay(child=self._vbox)
         overlay.add_overlay(update_notify)
         overlay.add_overlay(connection_notify)
         self.add(overlay)
@@ -319,7 +323,7 @@ class MainWindow(Gtk.ApplicationWindow):
             self._browser.back_to_current_album(force=True)
 
     def _on_song_changed(self, *args):
-        song = self._client.currentsong()
+        song = self._client.get_current_song()
         if song:
             if "date" in song:
                 date = f"({song['date']})"
@@ -341,7 +345,10 @@ class MainWindow(Gtk.ApplicationWindow):
                     )
                 )
             if self._settings.get_boolean("send-notify"):
-                if not self.is_active() and self._client.status()["state"] == "play":
+                if (
+                    not self.is_active()
+                    and self._client.get_status().get("state") == "play"
+                ):
                     self._notify.update(
                         str(song["title"]), f"{song['artist']}\n{album_with_date}"
                     )
@@ -353,31 +360,35 @@ class MainWindow(Gtk.ApplicationWindow):
             if self._use_csd:
                 self._header_bar.set_subtitle("")
 
-    def _on_reconnected(self, *args):
+    def _set_connected(self, connected):
         for action in (
             "stats",
             "toggle-lyrics",
             "back-to-current-album",
             "toggle-search",
         ):
-            self.lookup_action(action).set_enabled(True)
-        self._search_button.set_sensitive(True)
-        self._back_button.set_sensitive(True)
+            self.lookup_action(action).set_enabled(connected)
+        self._search_button.set_sensitive(connected)
+        self._back_button.set_sensitive(connected)
+
+    def _on_reconnected(self, *args):
+        self._set_connected(True)
+
+    def _on_connection_lost(self, *args):  # keep the content until it's resynced
+        self._vbox.set_sensitive(False)
+        self._set_connected(False)
+
+    def _on_connection_restored(self, *args):
+        self._vbox.set_sensitive(True)
+        self._set_connected(True)
 
     def _on_disconnected(self, *args):
+        self._vbox.set_sensitive(True)
         self.set_title("mpdevil")
         if self._use_csd:
             self._header_bar.set_subtitle("")
-        for action in (
-            "stats",
-            "toggle-lyrics",
-            "back-to-current-album",
-            "toggle-search",
-        ):
-            self.lookup_action(action).set_enabled(False)
         self._search_button.set_active(False)
-        self._search_button.set_sensitive(False)
-        self._back_button.set_sensitive(False)
+        self._set_connected(False)
 
     def _on_size_allocate(self, widget, rect):
         if not self.is_maximized() and not self._settings.get_boolean("mini-player"):
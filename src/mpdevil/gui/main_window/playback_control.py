@@ -58,7 +58,7 @@ class PlaybackControl(Gtk.ButtonBox):
         self._mini_player()
 
     def _refresh_tooltips(self, *args):
-        status = self._client.status()
+        status = self._client.get_status()
         song = status.get("song")
         length = status.get("playlistlength")
         if song is None or length is None:
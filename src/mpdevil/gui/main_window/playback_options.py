@@ -80,7 +80,7 @@ class PlaybackOptions(Gtk.ButtonBox):
 
     def _on_single_button_press_event(self, widget, event):
         if event.button == 3 and event.type == Gdk.EventType.BUTTON_PRESS:
-            state = self._client.status()["single"]
+            state = self._client.get_status().get("single")
             if state == "oneshot":
                 self._client.single("0")
             else:
@@ -134,7 +134,7 @@ class PlaylistView(TreeView):
         self,
     ):  # Gtk.TreePath(len(self._store) is used to generate an invalid TreePath (needed to unset cursor)
         self.set_cursor(Gtk.TreePath(len(self._store)), None, False)
-        song = self._client.status().get("song")
+        song = self._client.get_status().get("song")
         if song is None:
             self._selection.unselect_all()
             self._unselect()
@@ -180,11 +180,11 @@ class PlaylistView(TreeView):
                 self._inserted_path = None
             else:  # delete
                 self._client.delete(path)  # bad song index possible
-            self._playlist_version = int(self._client.status()["playlist"])
+            self._playlist_version = self._client.refresh_status().get_int("playlist")
         except MPDBase.CommandError as e:
             self._playlist_version = None
             self._client.emitter.emit(
-                "playlist", int(self._client.status()["playlist"])
+                "playlist", self._client.refresh_status().get_int("playlist")
             )
             raise e  # propagate exception
 
@@ -199,67 +199,63 @@ class PlaylistView(TreeView):
         self._store.handler_block(self._row_deleted)
         self._song_popover.popdown()
         self._unselect()
-        self._client.restrict_tagtypes(
-            "track", "disc", "title", "artist", "album", "date", "genre"
-        )
-        songs = []
+        tags = ("track", "disc", "title", "artist", "album", "date", "genre")
         if self._playlist_version is not None:
-            songs = self._client.plchanges(self._playlist_version)
+            songs = self._client.iter_plchanges(self._playlist_version, tags=tags)
         else:
-            songs = self._client.playlistinfo()
-        self._client.tagtypes("all")
-        if songs:
-            self.freeze_child_notify()
-            self._set_playlist_info("")
-            for song in songs:
-                try:
-                    treeiter = self._store.get_iter(song["pos"])
-                    self._store.set(
-                        treeiter,
-                        0,
+            songs = self._client.iter_playlistinfo(tags=tags)
+        self.freeze_child_notify()
+        for song in songs:
+            try:
+                treeiter = self._store.get_iter(song["pos"])
+                self._store.set(
+                    treeiter,
+                    0,
+                    song["track"][0],
+                    1,
+                    song["disc"][0],
+                    2,
+                    song["title"][0],
+                    3,
+                    str(song["artist"]),
+                    4,
+                    song["album"][0],
+                    5,
+                    str(song["duration"]),
+                    6,
+                    song["date"][0],
+                    7,
+                    str(song["genre"]),
+                    8,
+                    song["file"],
+                    9,
+                    Pango.Weight.BOOK,
+                    10,
+                    float(song["duration"]),
+                )
+            except:
+                self._store.insert_with_valuesv(
+                    -1,
+                    range(11),
+                    [
                         song["track"][0],
-                        1,
                         song["disc"][0],
-                        2,
                         song["title"][0],
-                        3,
                         str(song["artist"]),
-                        4,
                         song["album"][0],
-                        5,
                         str(song["duration"]),
-                        6,
                         song["date"][0],
-                        7,
                         str(song["genre"]),
-                        8,
                         song["file"],
-                        9,
                         Pango.Weight.BOOK,
-                        10,
                         float(song["duration"]),
-                    )
-                except:
-                    self._store.insert_with_valuesv(
-                        -1,
-                        range(11),
-                        [
-                            song["track"][0],
-                            song["disc"][0],
-                            song["title"][0],
-                            str(song["artist"]),
-                            song["album"][0],
-                            str(song["duration"]),
-                            song["date"][0],
-                            str(song["genre"]),
-                            song["file"],
-                            Pango.Weight.BOOK,
-                            float(song["duration"]),
-                        ],
-                    )
-            self.thaw_child_notify()
+                    ],
+                )
+        self.thaw_child_notify()
         for i in reversed(
-            range(int(self._client.status()["playlistlength"]), len(self._store))
+            range(
+                self._client.get_status().get_int("playlistlength"), len(self._store)
+            )
         ):
             treeiter = self._store.get_iter(i)
             self._store.remove(treeiter)
@@ -285,7 +281,7 @@ class PlaylistView(TreeView):
 
     def _on_song_changed(self, *args):
         self._refresh_selection()
-        if self._client.status()["state"] == "play":
+        if self._client.get_status().get("state") == "play":
             self.scroll_to_selected_title()
 
     def _on_disconnected(self, *args):
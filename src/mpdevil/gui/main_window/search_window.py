@@ -1,6 +1,8 @@
 from gettext import gettext as _, ngettext
 import gi
 import threading
+import itertools
+from mpd import base as MPDBase
 from mpdevil.decorators import main_thread_function
 from mpdevil.gui.main_window.songs_window import SongsWindow
 
@@ -38,26 +40,35 @@ class SearchThread(threading.Thread):
             self._exit()
 
     def run(self):
+        try:
+            with self._client.background_connection() as client:
+                self._search(client)
+        except (MPDBase.MPDError, OSError) as e:
+            print(e)
+        self._exit()
+
+    def _search(self, client):
         hits = 0
-        stripe_size = 1000
-        songs = self._get_songs(0, stripe_size)
-        stripe_start = stripe_size
-        while songs:
-            hits += len(songs)
-            if not self._append_songs(songs):
-                self._exit()
-                return
+        batch_size = 1000
+        songs = client.iter_search(
+            self._search_tag,
+            self._search_text,
+            tags=("track", "title", "artist", "album"),
+        )
+        batch = list(itertools.islice(songs, batch_size))
+        while batch:
+            hits += len(batch)
+            if not self._append_songs(batch):
+                break
             GLib.idle_add(self._search_entry.progress_pulse)
             GLib.idle_add(
                 self._hits_label.set_text,
                 ngettext("{hits} hit", "{hits} hits", hits).format(hits=hits),
             )
-            stripe_end = stripe_start + stripe_size
-            songs = self._get_songs(stripe_start, stripe_end)
-            stripe_start = stripe_end
-        if hits > 0:
+            batch = list(itertools.islice(songs, batch_size))
+        songs.close()  # drops the connection if the search was stopped
+        if hits > 0 and not self._stop_flag:
             GLib.idle_add(self._action_bar.set_sensitive, True)
-        self._exit()
 
     def _exit(self):
         def callback():
@@ -68,18 +79,6 @@ class SearchThread(threading.Thread):
 
         GLib.idle_add(callback)
 
-    @main_thread_function
-    def _get_songs(self, start, end):
-        if self._stop_flag:
-            return []
-        else:
-            self._client.restrict_tagtypes("track", "title", "artist", "album")
-            songs = self._client.search(
-                self._search_tag, self._search_text, "window", f"{start}:{end}"
-            )
-            self._client.tagtypes("all")
-            return songs
-
     @main_thread_function
     def _append_songs(self, songs):
         for song in songs:
@@ -207,7 +206,7 @@ class SearchWindow(Gtk.Box):
             self._tag_combo_box.handler_block(self._tag_combo_box_changed)
             self._tag_combo_box.remove_all()
             self._tag_combo_box.append_text(_("all tags"))
-            for tag in self._client.tagtypes():
+            for tag in self._client.capabilities.tagtypes:
                 if not tag.startswith("MUSICBRAINZ"):
                     self._tag_combo_box.append_text(tag)
             self._tag_combo_box.set_active(0)
@@ -90,8 +90,8 @@ class SeekBar(Gtk.Box):
                 self._client.seekcur(self._scale.get_value())
                 self._jumped = False
             else:  # restore state
-                status = self._client.status()
-                self._refresh(None, float(status["elapsed"]), float(status["duration"]))
+                status = self._client.get_status()
+                self._refresh(None, status.get_elapsed(), status.get_float("duration"))
 
     def _on_change_value(
         self, range, scroll, value
@@ -1,4 +1,5 @@
 from gettext import gettext as _
+import locale
 import gi
 
 gi.require_version("Gtk", "3.0")
@@ -101,18 +102,24 @@ class SongPopover(Gtk.Popover):
         self.set_relative_to(widget)
         window = self.get_toplevel()
         self._scroll.set_max_content_height(window.get_size()[1] // 2)
+        self._client.run_async(
+            lambda client, uri: client.lsinfo(uri)[0], self._open_song, uri
+        )
+
+    def _open_song(self, song):
+        if song["file"] != self._uri:  # popover was reopened in the meantime
+            return
         self._store.clear()
-        song = self._client.lsinfo(uri)[0]
         for tag, value in song.items():
             if tag == "duration":
-                self._store.append([tag + ":", str(value), locale.str(value)])
+                self._store.append([tag + ":", str(value), locale.str(float(value))])
             elif tag in ("last-modified", "format"):
                 self._store.append([tag + ":", str(value), value.raw()])
             else:
                 self._store.append(
                     [tag + ":", str(value), GLib.markup_escape_text(str(value))]
                 )
-        abs_path = self._client.get_absolute_path(uri)
+        abs_path = self._client.get_absolute_path(self._uri)
         if abs_path is None:  # show open with button when song is on the same computer
             self._open_button_revealer.set_reveal_child(False)
         else:
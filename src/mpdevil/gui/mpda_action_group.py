@@ -24,6 +24,7 @@ class MPDActionGroup(Gio.SimpleActionGroup):
             "single-oneshot",
         )
         self._data = self._disable_on_stop_data + self._enable_on_reconnect_data
+        self._enabled_before_loss = ()
         for name in self._data:
             action = Gio.SimpleAction.new(name, None)
             action.connect("activate", getattr(self, ("_on_" + name.replace("-", "_"))))
@@ -33,6 +34,10 @@ class MPDActionGroup(Gio.SimpleActionGroup):
         self._client.emitter.connect("state", self._on_state)
         self._client.emitter.connect("disconnected", self._on_disconnected)
         self._client.emitter.connect("reconnected", self._on_reconnected)
+        self._client.emitter.connect("connection_lost", self._on_connection_lost)
+        self._client.emitter.connect(
+            "connection_restored", self._on_connection_restored
+        )
 
     def _on_toggle_play(self, action, param):
         self._client.toggle_play()
@@ -85,3 +90,13 @@ class MPDActionGroup(Gio.SimpleActionGroup):
     def _on_reconnected(self, *args):
         for action in self._enable_on_reconnect_data:
             self.lookup_action(action).set_enabled(True)
+
+    def _on_connection_lost(self, *args):
+        self._enabled_before_loss = [
+            action for action in self._data if self.lookup_action(action).get_enabled()
+        ]
+        self._on_disconnected()
+
+    def _on_connection_restored(self, *args):
+        for action in self._enabled_before_loss:
+            self.lookup_action(action).set_enabled(True)
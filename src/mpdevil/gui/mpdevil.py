@@ -1,10 +1,11 @@
 import os
 import locale
+import signal
 from gettext import gettext as _, bindtextdomain, textdomain
 import gi
 from mpdevil.gui.main_window import MainWindow
 from mpdevil.gui.mpda_action_group import MPDActionGroup
-from mpdevil.mpd_client_wrapper import Client
+from mpdevil.mpd_client_wrapper import Client, enable_command_stats
 from mpdevil.constants import LOCALE_DIR, RESOURCES_DIR
 
 gi.require_version("Gtk", "3.0")
@@ -75,11 +76,20 @@ class mpdevil(Gtk.Application):
             _("Debug mode"),
             None,
         )
+        self.add_main_option(
+            "command-stats",
+            0,
+            GLib.OptionFlags.NONE,
+            GLib.OptionArg.STRING,
+            _("Write MPD command statistics to FILE (on exit and on SIGUSR1)"),
+            "FILE",
+        )
         self._settings = Settings()
         self._client = Client(self._settings)
         Notify.init("mpdevil")
         self._notify = Notify.Notification()
         self._window = None
+        self._command_stats = None
 
     def do_activate(self):
         if not self._window:  # allow just one instance
@@ -145,6 +155,12 @@ class mpdevil(Gtk.Application):
             import logging
 
             logging.basicConfig(level=logging.DEBUG)
+        path = options.get("command-stats", os.environ.get("MPDEVIL_COMMAND_STATS"))
+        if path and self._command_stats is None:
+            self._command_stats = enable_command_stats(path)
+            GLib.unix_signal_add(
+                GLib.PRIORITY_DEFAULT, signal.SIGUSR1, self._on_dump_command_stats
+            )
         self.activate()
         return 0
 
@@ -156,9 +172,15 @@ class mpdevil(Gtk.Application):
         dialog.run()
         dialog.destroy()
 
+    def _on_dump_command_stats(self):
+        self._command_stats.dump()
+        return True
+
     def _on_quit(self, *args):
         if self._settings.get_boolean("stop-on-quit") and self._client.connected():
             self._client.stop()
+        if self._command_stats is not None:
+            self._command_stats.dump()
         self._notify.close()
         Notify.uninit()
         self.quit()
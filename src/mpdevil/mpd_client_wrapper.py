@@ -1,8 +1,19 @@
 import gi
-import collections
 import datetime
 import os
+import re
+import sys
+import socket
 import locale
+import queue
+import threading
+import time
+import random
+import contextlib
+import collections
+import json
+import hashlib
+import bisect
 from mpd import MPDClient, base as MPDBase
 from gettext import ngettext
 from mpdevil.constants import (
@@ -92,28 +103,79 @@ class _MultiTag(list):
         return ", ".join(self)
 
 
-class _Song(collections.UserDict):
+class _Song:
+    # compact song record, tags are decoded on first access
+    __slots__ = (
+        "file",
+        "pos",
+        "id",
+        "range",
+        "title",
+        "artist",
+        "album",
+        "albumartist",
+        "albumartistsort",
+        "artistsort",
+        "albumsort",
+        "track",
+        "disc",
+        "date",
+        "genre",
+        "duration",
+        "_rare_tags",
+    )
+    _FIELDS = frozenset(__slots__[:-1])
+    _RAW_FIELDS = frozenset(("file", "pos", "id", "range"))
+    _DECODERS = {
+        "duration": Duration,
+        "format": Format,
+        "last-modified": _LastModified,
+    }
+
+    def __init__(self, data):
+        self._rare_tags = None
+        for key, value in data.items():
+            self[key] = value
+
+    def _get(self, key):
+        if key in self._FIELDS:
+            return getattr(self, key, None)
+        elif self._rare_tags is None:
+            return None
+        else:
+            return self._rare_tags.get(key)
+
     def __setitem__(self, key, value):
         if (
             key == "time"
         ):  # time is deprecated https://mpd.readthedocs.io/en/latest/protocol.html#other-metadata
             pass
-        elif key == "duration":
-            super().__setitem__(key, Duration(value))
-        elif key == "format":
-            super().__setitem__(key, Format(value))
-        elif key == "last-modified":
-            super().__setitem__(key, _LastModified(value))
-        elif key in ("range", "file", "pos", "id"):
-            super().__setitem__(key, value)
+        elif key in self._FIELDS:
+            setattr(self, key, value)
         else:
-            if isinstance(value, list):
-                super().__setitem__(key, _MultiTag(value))
+            if self._rare_tags is None:
+                self._rare_tags = {}
+            self._rare_tags[key] = value
+
+    def __getitem__(self, key):
+        value = self._get(key)
+        if value is None:
+            return self.__missing__(key)
+        elif type(value) is list or (
+            type(value) is str and key not in self._RAW_FIELDS
+        ):
+            # decode raw value and keep the result
+            if key in self._DECODERS:
+                value = self._DECODERS[key](value)
+            elif isinstance(value, list):
+                value = _MultiTag(value)
             else:
-                super().__setitem__(key, _MultiTag([value]))
+                value = _MultiTag([value])
+            self[key] = value
+        return value
 
     def __missing__(self, key):
-        if self.data:
+        if self:
             if key == "albumartist":
                 return self["artist"]
             elif key == "albumartistsort":
@@ -123,7 +185,7 @@ class _Song(collections.UserDict):
             elif key == "albumsort":
                 return self["album"]
             elif key == "title":
-                return _MultiTag([os.path.basename(self.data["file"])])
+                return _MultiTag([os.path.basename(self.file)])
             elif key == "duration":
                 return Duration()
             else:
@@ -131,6 +193,23 @@ class _Song(collections.UserDict):
         else:
             return None
 
+    def __contains__(self, key):
+        return self._get(key) is not None
+
+    def __iter__(self):
+        for key in self.__slots__[:-1]:
+            if getattr(self, key, None) is not None:
+                yield key
+        if self._rare_tags is not None:
+            yield from self._rare_tags
+
+    def __bool__(self):
+        return next(iter(self), None) is not None
+
+    def items(self):
+        for key in self:
+            yield (key, self[key])
+
 
 class _BinaryCover(bytes):
     def get_pixbuf(self, size):
@@ -162,6 +241,50 @@ class _FileCover(str):
         return pixbuf
 
 
+class _Status:
+    # snapshot of "status" taken by the main loop, reading it needs no round trip
+    def __init__(self, status=None, version=0, time=0):
+        if status is None:
+            status = {}
+        self._status = status
+        self.version = version  # increases with every poll
+        self.time = time  # GLib.get_monotonic_time() of the poll
+
+    def __getitem__(self, key):
+        return self._status[key]
+
+    def __contains__(self, key):
+        return key in self._status
+
+    def get(self, key, default=None):
+        return self._status.get(key, default)
+
+    def keys(self):
+        return self._status.keys()
+
+    def items(self):
+        return self._status.items()
+
+    def get_int(self, key, default=0):
+        if key in self._status:
+            return int(self._status[key])
+        return default
+
+    def get_float(self, key, default=0.0):
+        if key in self._status:
+            return float(self._status[key])
+        return default
+
+    def get_boolean(self, key):  # repeat, random, consume
+        return self._status.get(key) == "1"
+
+    def get_elapsed(self):  # extrapolated while playing
+        elapsed = self.get_float("elapsed")
+        if self._status.get("state") == "play":
+            elapsed += (GLib.get_monotonic_time() - self.time) / 1000000
+        return elapsed
+
+
 class _EventEmitter(GObject.Object):
     __gsignals__ = {
         "updating_db": (GObject.SignalFlags.RUN_FIRST, None, ()),
@@ -169,6 +292,9 @@ class _EventEmitter(GObject.Object):
         "disconnected": (GObject.SignalFlags.RUN_FIRST, None, ()),
         "reconnected": (GObject.SignalFlags.RUN_FIRST, None, ()),
         "connection_error": (GObject.SignalFlags.RUN_FIRST, None, ()),
+        # the state is kept until the connection is restored or "disconnected"
+        "connection_lost": (GObject.SignalFlags.RUN_FIRST, None, ()),
+        "connection_restored": (GObject.SignalFlags.RUN_FIRST, None, ()),
         "current_song": (GObject.SignalFlags.RUN_FIRST, None, ()),
         "state": (GObject.SignalFlags.RUN_FIRST, None, (str,)),
         "elapsed": (
@@ -190,122 +316,1016 @@ class _EventEmitter(GObject.Object):
     }
 
 
-class Client(MPDClient):
-    def __init__(self, settings):
+_LOWER_KEYS = {}  # cache for lower case protocol keys
+
+
+class _Capabilities:
+    # what the server supports, queried once per connection
+    def __init__(self, commands=(), tagtypes=(), mpd_version=None):
+        self.commands = frozenset(commands)
+        self.tagtypes = list(tagtypes)
+        if mpd_version is None:
+            self.version = ()
+        else:
+            self.version = tuple(int(part) for part in mpd_version.split("."))
+
+    def has_version(self, major, minor, patch=0):
+        return self.version >= (major, minor, patch)
+
+
+class _Connection(MPDClient):
+    # mpd limits the size of command lists ("max_command_list_size", default 2 MiB)
+    COMMAND_LIST_CHUNK_SIZE = 1000
+    # covers are sent in chunks of "binarylimit" bytes (default 8 KiB), one round trip each
+    BINARY_LIMIT = 1048576
+    # mpd nests groups from the last to the first one,
+    # this results in the same order as "get_artists" + "get_albums" per artist
+    ALBUM_GROUPS = (
+        "group",
+        "date",
+        "group",
+        "albumsort",
+        "group",
+        "albumartist",
+        "group",
+        "albumartistsort",
+    )
+    # seconds until an unresponsive server is treated as disconnected ("timeout" setting)
+    TIMEOUT = 10
+    # minimal timeouts of commands which can take long on large databases,
+    # only used by background threads
+    COMMAND_TIMEOUTS = {
+        "add": 60,
+        "albumart": 60,
+        "count": 60,
+        "findadd": 60,
+        "list": 60,
+        "listallinfo": 60,
+        "readpicture": 60,
+        "rescan": 60,
+        "search": 60,
+        "searchadd": 60,
+        "update": 60,
+    }
+
+    def __init__(self, response_cache=None):
         super().__init__()
-        self._settings = settings
-        self.emitter = _EventEmitter()
-        self._last_status = {}
-        self._refresh_interval = self._settings.get_int("refresh-interval")
-        self._main_timeout_id = None
-        self.lib_path = None
+        self._response_cache = response_cache
+        self._command_timeout = self.TIMEOUT
+        self._list_timeout = None  # longest timeout of the open command list
 
-        # connect
-        self._settings.connect(
-            "changed::active-profile", self._on_active_profile_changed
-        )
+    def connect_to(self, args, password, timeout=TIMEOUT):
+        self._command_timeout = timeout
+        self.timeout = timeout
+        self.connect(*args)
+        self.command_list_ok_begin()
+        if password:
+            self.password(password)
+        MPDClient.commands(self)
+        MPDClient.tagtypes(self)  # all tags are enabled on new connections
+        commands, tagtypes = self.command_list_end()[-2:]
+        self.capabilities = _Capabilities(commands, tagtypes, self.mpd_version)
+        if "binarylimit" in self.capabilities.commands:
+            try:
+                self.binarylimit(self.BINARY_LIMIT)
+            except MPDBase.CommandError:  # limited by "max_output_buffer_size"
+                pass
 
     # workaround for list group
     # see: https://github.com/Mic92/python-mpd2/pull/187
+    # keys of the previous object are reused when "lookup_delimiter" is set,
+    # the objects of a grouped "list" response are nested in order of first appearance
     def _parse_objects(self, lines, delimiters=[], lookup_delimiter=False):
+        lower_keys = _LOWER_KEYS
         obj = {}
-        for key, value in self._parse_pairs(lines):
-            key = key.lower()
-            if lookup_delimiter and key not in delimiters:
-                delimiters = delimiters + [key]
-            if obj:
-                if key in delimiters:
-                    if lookup_delimiter:
-                        if key in obj:
-                            yield obj
-                            obj = obj.copy()
-                            while delimiters[-1] != key:
-                                obj.pop(delimiters[-1], None)
-                                delimiters.pop()
+        for line in lines:
+            key, separator, value = line.partition(": ")
+            if not separator:
+                raise MPDBase.ProtocolError(f"Could not parse pair: '{line}'")
+            try:
+                key = lower_keys[key]
+            except KeyError:
+                key = lower_keys.setdefault(key, key.lower())
+            if key in obj:
+                if lookup_delimiter:
+                    yield obj
+                    parent = obj
+                    obj = {}
+                    for parent_key in parent:
+                        if parent_key == key:
+                            break
+                        obj[parent_key] = parent[parent_key]
+                elif key in delimiters:
+                    yield obj
+                    obj = {}
+                else:
+                    if type(obj[key]) is list:
+                        obj[key].append(value)
                     else:
-                        yield obj
-                        obj = {}
-                elif key in obj:
-                    if not isinstance(obj[key], list):
                         obj[key] = [obj[key], value]
-                    else:
-                        obj[key].append(value)
                     continue
+            elif obj and key in delimiters:
+                yield obj
+                obj = {}
             obj[key] = value
         if obj:
             yield obj
 
     _parse_objects_direct = _parse_objects
 
+    def _write_command(self, command, args=[]):
+        # the response has to arrive within the timeout of the command,
+        # a command list gets the longest timeout of its commands
+        timeout = max(self._command_timeout, self.COMMAND_TIMEOUTS.get(command, 0))
+        if command in ("command_list_begin", "command_list_ok_begin"):
+            self._list_timeout = timeout
+        elif command == "command_list_end":
+            timeout = self._list_timeout
+            self._list_timeout = None
+        elif self._list_timeout is not None:
+            self._list_timeout = max(self._list_timeout, timeout)
+        if self._timeout != timeout:
+            self.timeout = timeout
+        super()._write_command(command, args)
+
+    def _read_line(self):
+        try:
+            return super()._read_line()
+        except socket.timeout:
+            self._on_timeout()
+            raise MPDBase.ConnectionError("Connection timed out")
+
+    def _read_chunk(self, amount):
+        try:
+            return super()._read_chunk(amount)
+        except socket.timeout:
+            self._on_timeout()
+            raise MPDBase.ConnectionError("Connection timed out")
+
+    def _on_timeout(self):  # the state of the response is unknown
+        self.disconnect()
+
+    def _take_over(self, connection):
+        # moves the socket of a connection made in another thread to this one
+        self.disconnect()
+        for attr in (
+            "mpd_version",
+            "_sock",
+            "_rbfile",
+            "_wfile",
+            "_timeout",
+            "_command_timeout",
+            "_tagtypes",
+            "capabilities",
+        ):
+            setattr(self, attr, getattr(connection, attr))
+        connection._reset()  # without closing the socket
+
+    # tag mask ("tagtypes") of the connection, None means all tags are enabled
+    def _reset(self):
+        super()._reset()
+        self._list_timeout = None
+        self._tagtypes = None
+        self.capabilities = _Capabilities()
+
+    def _get_tag_mask(self, tags):
+        # tags can't be hidden before mpd 0.21, these servers always send all tags
+        capabilities = self.capabilities
+        if tags is None or (
+            capabilities.version and not capabilities.has_version(0, 21)
+        ):
+            return None
+        return frozenset(tags)
+
+    def _write_tagtypes(self, tags):
+        if tags is None:
+            MPDClient.tagtypes(self, "all")
+        else:
+            MPDClient.tagtypes(self, "clear")
+            for tag in tags:
+                MPDClient.tagtypes(self, "enable", tag)
+
+    def _end_tagtypes_list(self, tags):
+        try:
+            results = self.command_list_end()
+        except MPDBase.CommandError:
+            self._tagtypes = "unknown"  # send the tag mask again with the next query
+            raise
+        self._tagtypes = tags
+        return results
+
+    def _set_tagtypes(self, tags):
+        tags = self._get_tag_mask(tags)
+        if tags != self._tagtypes:
+            self.command_list_ok_begin()
+            self._write_tagtypes(tags)
+            self._end_tagtypes_list(tags)
+
+    def _query(self, tags, command, *args):
+        # the tag mask is only sent if it changes and shares the command list with the query
+        tags = self._get_tag_mask(tags)
+        if tags == self._tagtypes:
+            return getattr(MPDClient, command)(self, *args)
+        self.command_list_ok_begin()
+        self._write_tagtypes(tags)
+        getattr(MPDClient, command)(self, *args)
+        return self._end_tagtypes_list(tags)[-1]
+
     # overloads
     def currentsong(self, *args):
-        return _Song(super().currentsong(*args))
+        return _Song(self._query(None, "currentsong", *args))
 
-    def search(self, *args):
-        return [_Song(song) for song in super().search(*args)]
+    def search(self, *args, tags=None):
+        return [_Song(song) for song in self._query(tags, "search", *args)]
 
-    def find(self, *args):
-        return [_Song(song) for song in super().find(*args)]
+    def find(self, *args, tags=None):
+        return self._cached(
+            ("find", tags, *args),
+            lambda: [_Song(song) for song in self._query(tags, "find", *args)],
+        )
+
+    def list(self, *args):
+        return self._cached(
+            ("list", *args), lambda: super(_Connection, self).list(*args)
+        )
+
+    def count(self, *args):
+        return self._cached(
+            ("count", *args), lambda: super(_Connection, self).count(*args)
+        )
 
-    def playlistinfo(self):
-        return [_Song(song) for song in super().playlistinfo()]
+    def _cached(self, key, query):
+        # cached responses are shared between connections, don't modify them
+        if self._response_cache is None:
+            return query()
+        db_update, response = self._response_cache.get(key)
+        if response is None:
+            response = query()
+            self._response_cache.put(key, response, db_update)
+        return response
 
-    def plchanges(self, version):
-        return [_Song(song) for song in super().plchanges(version)]
+    def playlistinfo(self, tags=None):
+        return [_Song(song) for song in self._query(tags, "playlistinfo")]
+
+    def plchanges(self, version, tags=None):
+        return [_Song(song) for song in self._query(tags, "plchanges", version)]
 
     def lsinfo(self, uri):
-        return [_Song(song) for song in super().lsinfo(uri)]
+        return [_Song(song) for song in self._query(None, "lsinfo", uri)]
+
+    def tagtypes(self, *args):
+        if not args:  # list the tags which can be enabled
+            return self._query(None, "tagtypes")
+        self._tagtypes = "unknown"
+        return super().tagtypes(*args)
+
+    # streaming variants (songs are parsed while they are read from the socket)
+    def _iterate(self, tags, command, *args):
+        self._set_tagtypes(tags)
+        self.iterate = True
+        try:
+            songs = getattr(MPDClient, command)(self, *args)
+        finally:
+            self.iterate = False
+        try:
+            for song in songs:
+                yield _Song(song)
+        except GeneratorExit:
+            self._abandon_response(songs)
+            raise
+
+    def _abandon_response(self, response):
+        # reading the rest of a large response would take as long as the full query
+        self.disconnect()
+
+    def iter_search(self, *args, tags=None):
+        return self._iterate(tags, "search", *args)
+
+    def iter_find(self, *args, tags=None):
+        return self._iterate(tags, "find", *args)
+
+    def iter_playlistinfo(self, tags=None):
+        return self._iterate(tags, "playlistinfo")
+
+    def iter_plchanges(self, version, tags=None):
+        return self._iterate(tags, "plchanges", version)
+
+    def iter_listallinfo(self, *args, tags=None):
+        return self._iterate(tags, "listallinfo", *args)
+
+    def command_list(self, command, args_list):
+        # send commands in chunks using command lists to avoid one round trip per command
+        func = getattr(self, command)
+        results = []
+        for i in range(0, len(args_list), self.COMMAND_LIST_CHUNK_SIZE):
+            self.command_list_ok_begin()
+            for args in args_list[i : i + self.COMMAND_LIST_CHUNK_SIZE]:
+                func(*args)
+            results.extend(self.command_list_end())
+        return results
+
+    def find_first(self, tag_filters, tags=None):
+        # first song (or None) for each filter, the finds share chunked command lists
+        self._set_tagtypes(tags)
+        songs = []
+        for i in range(0, len(tag_filters), self.COMMAND_LIST_CHUNK_SIZE):
+            self.command_list_ok_begin()
+            for tag_filter in tag_filters[i : i + self.COMMAND_LIST_CHUNK_SIZE]:
+                MPDClient.find(self, *tag_filter, "window", "0:1")
+            for result in self.command_list_end():
+                if result:
+                    songs.append(_Song(result[0]))
+                else:
+                    songs.append(None)
+        return songs
+
+    def comp_list(self, *args):  # simulates listing behavior of python-mpd2 1.0
+        native_list = self.list(*args)
+        if len(native_list) > 0:
+            if isinstance(native_list[0], dict):
+                return [l[args[0]] for l in native_list]
+            else:
+                return native_list
+        else:
+            return []
+
+    def get_genres(self):
+        return self.comp_list("genre")
+
+    def get_artists(self, genre):
+        if genre is None:
+            artists = self.list("albumartist", "group", "albumartistsort")
+        else:
+            artists = self.list(
+                "albumartist", "genre", genre, "group", "albumartistsort"
+            )
+        return [
+            (artist["albumartist"], artist["albumartistsort"]) for artist in artists
+        ]
+
+    def get_albums(self, albumartist, albumartistsort, genre):
+        if genre is None:
+            genre_filter = ()
+        else:
+            genre_filter = ("genre", genre)
+        return self.list(
+            "album",
+            "albumartist",
+            albumartist,
+            "albumartistsort",
+            albumartistsort,
+            *genre_filter,
+            "group",
+            "date",
+            "group",
+            "albumsort",
+        )
+
+    def get_all_albums(self, genre, artist=None):
+        tag_filter = (
+            []
+        )  # artist is (albumartist, albumartistsort) like in "get_artists"
+        if artist is not None:
+            tag_filter.extend(("albumartist", artist[0], "albumartistsort", artist[1]))
+        if genre is not None:
+            tag_filter.extend(("genre", genre))
+        return self.list("album", *tag_filter, *self.ALBUM_GROUPS)
+
+    def get_cover_binary(self, uri):
+        for command in ("albumart", "readpicture"):
+            if command in self.capabilities.commands:
+                try:
+                    binary = getattr(self, command)(uri).get("binary")
+                except MPDBase.CommandError:  # no cover
+                    binary = None
+                if binary:
+                    return binary
+        return None
+
+
+class _IdleClient(_Connection):
+    # second connection which is parked in "idle" until mpd reports a change
+    # see: https://mpd.readthedocs.io/en/latest/protocol.html#querying-mpd-s-status
+    SUBSYSTEMS = (
+        "player",
+        "mixer",
+        "options",
+        "playlist",
+        "database",
+        "update",
+        "output",
+    )
+
+    def send_idle(self):
+        self._write_command("idle", self.SUBSYSTEMS)
+
+    def fetch_idle(self):
+        return list(self._parse_list(self._read_lines()))
+
+
+class _ResponseCache:
+    # bounded lru cache for database queries, entries belong to one database version ("db_update")
+    def __init__(self, size):
+        self._size = size
+        self._lock = threading.Lock()
+        self._responses = collections.OrderedDict()
+        self._db_update = None  # caching is disabled while there is no database version
+        self.hits = 0
+        self.misses = 0
+
+    def reset(self, db_update):
+        with self._lock:
+            self._responses.clear()
+            self._db_update = db_update
+
+    def get_db_update(self):
+        return self._db_update
+
+    def get(self, key):  # returns the current database version and the response or None
+        with self._lock:
+            if self._db_update is None:
+                return (None, None)
+            response = self._responses.get(key)
+            if response is None:
+                self.misses += 1
+            else:
+                self._responses.move_to_end(key)
+                self.hits += 1
+            return (self._db_update, response)
+
+    def put(self, key, response, db_update):
+        with self._lock:
+            # drop responses of queries which were sent before the database changed
+            if db_update is None or db_update != self._db_update:
+                return
+            self._responses[key] = response
+            self._responses.move_to_end(key)
+            if len(self._responses) > self._size:
+                self._responses.popitem(last=False)
+
+    def info(self):
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "size": len(self._responses),
+                "maxsize": self._size,
+                "db_update": self._db_update,
+            }
+
+
+class _LibrarySnapshot:
+    # tags of all albums which are needed for browsing, answers the browser queries locally
+    VERSION = 2
+    # "genre" is the outermost group, the rows are in the same order as sorted tuples
+    FIELDS = ("genre", "albumartistsort", "albumartist", "albumsort", "date", "album")
+
+    def __init__(self, db_update, albums, album_counts):
+        self.db_update = db_update
+        self._albums = albums  # tuples of FIELDS, sorted
+        self._album_counts = album_counts  # number of songs per album name
+
+    def save(self, path):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(
+                {
+                    "version": self.VERSION,
+                    "db_update": self.db_update,
+                    "albums": self._albums,
+                    "album_counts": self._album_counts,
+                },
+                f,
+            )
+        os.replace(tmp_path, path)
+
+    def get_genres(self):
+        return sorted({album[0] for album in self._albums if album[0]})
+
+    def get_artists(self, genre):
+        artists = {
+            (album[2], album[1])
+            for album in self._albums
+            if genre is None or album[0] == genre
+        }
+        return sorted(artists, key=lambda artist: (artist[1], artist[0]))
+
+    def get_albums(self, albumartist, albumartistsort, genre):
+        albums = {
+            (album[3], album[4], album[5])
+            for album in self._albums
+            if album[2] == albumartist
+            and album[1] == albumartistsort
+            and (genre is None or album[0] == genre)
+        }
+        return [
+            {"albumsort": albumsort, "date": date, "album": album}
+            for albumsort, date, album in sorted(albums)
+        ]
+
+    def get_all_albums(self, genre, artist=None):
+        albums = {
+            album[1:]
+            for album in self._albums
+            if (genre is None or album[0] == genre)
+            and (artist is None or (album[2], album[1]) == artist)
+        }
+        return [
+            {
+                "albumartistsort": albumartistsort,
+                "albumartist": albumartist,
+                "albumsort": albumsort,
+                "date": date,
+                "album": album,
+            }
+            for albumartistsort, albumartist, albumsort, date, album in sorted(albums)
+        ]
+
+
+def _get_library_path(connection_args):
+    # one snapshot per server
+    key = hashlib.sha1(repr(connection_args).encode()).hexdigest()
+    return os.path.join(GLib.get_user_cache_dir(), "mpdevil", f"library-{key}.json")
+
+
+def _load_library(path):  # returns None if there is no usable snapshot
+    try:
+        with open(path) as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if data.get("version") != _LibrarySnapshot.VERSION:
+        return None
+    return _LibrarySnapshot(
+        data["db_update"],
+        [tuple(album) for album in data["albums"]],
+        data["album_counts"],
+    )
+
+
+def _get_album_counts(connection):
+    # "MPDClient.count" merges the grouped response into a single object,
+    # the command is sent directly which skips the checks of python-mpd2
+    assert connection._command_list is None, "not possible in a command list"
+    connection._write_command("count", ["group", "album"])
+    return {
+        count.get("album", ""): int(count["songs"])
+        for count in connection._parse_objects(connection._read_lines(), ["album"])
+    }
+
+
+def _list_albums(connection, *args):
+    # groups of FIELDS, bypasses the response cache, the snapshot holds the result
+    groups = (*_Connection.ALBUM_GROUPS, "group", "genre")
+    return MPDClient.list(connection, "album", *args, *groups)
+
+
+def _album_tuples(albums):
+    return {
+        tuple(album.get(field, "") for field in _LibrarySnapshot.FIELDS)
+        for album in albums
+    }
+
+
+def _fetch_library(connection):
+    db_update = connection.stats().get("db_update")
+    album_counts = _get_album_counts(connection)
+    return _LibrarySnapshot(
+        db_update, sorted(_album_tuples(_list_albums(connection))), album_counts
+    )
+
+
+def _sync_library(connection, library):
+    # only albums with added, removed or modified songs are queried again
+    db_update = connection.stats().get("db_update")
+    album_counts = _get_album_counts(connection)
+    changed = {
+        album
+        for album in album_counts.keys() | library._album_counts.keys()
+        if album_counts.get(album) != library._album_counts.get(album)
+    }
+    modified = MPDClient.list(connection, "album", "modified-since", library.db_update)
+    changed.update(album.get("album", "") for album in modified)
+    if len(changed) > len(album_counts) // 4:  # a full rebuild is cheaper
+        return _fetch_library(connection)
+    albums = {album for album in library._albums if album[5] not in changed}
+    changed = [album for album in changed if album in album_counts]
+    for i in range(0, len(changed), connection.COMMAND_LIST_CHUNK_SIZE):
+        connection.command_list_ok_begin()
+        for album in changed[i : i + connection.COMMAND_LIST_CHUNK_SIZE]:
+            _list_albums(connection, "album", album)
+        for response in connection.command_list_end():
+            albums.update(_album_tuples(response))
+    return _LibrarySnapshot(db_update, sorted(albums), album_counts)
+
+
+class _CommandStats:
+    # latency and payload statistics per command, see "enable_command_stats"
+    BUCKETS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000)  # upper bounds in ms
+
+    def __init__(self, path):
+        self._path = path
+        self._lock = threading.Lock()
+        self._commands = {}
+
+    def record(self, command, site, latency, received):
+        with self._lock:
+            if command not in self._commands:
+                self._commands[command] = {
+                    "count": 0,
+                    "total_ms": 0.0,
+                    "max_ms": 0.0,
+                    "bytes_received": 0,
+                    "histogram": [0] * (len(self.BUCKETS) + 1),
+                    "sites": {},
+                }
+            stats = self._commands[command]
+            stats["count"] += 1
+            stats["total_ms"] += latency
+            stats["max_ms"] = max(stats["max_ms"], latency)
+            stats["bytes_received"] += received
+            stats["histogram"][bisect.bisect_left(self.BUCKETS, latency)] += 1
+            stats["sites"][site] = stats["sites"].get(site, 0) + 1
+
+    def dump(self):
+        with self._lock:
+            data = json.dumps(
+                {"histogram_buckets_ms": self.BUCKETS, "commands": self._commands},
+                indent=2,
+                sort_keys=True,
+            )
+        try:
+            with open(self._path, "w") as f:
+                f.write(data)
+        except OSError as e:
+            print(e)
+
+
+def _get_calling_site(frame):
+    # first mpdevil frame outside of this module, falls back to the first one in this module
+    site = None
+    while frame is not None:
+        module = frame.f_globals.get("__name__", "")
+        if module.startswith("mpdevil."):
+            if module != __name__:
+                return f"{module}.{frame.f_code.co_name}"
+            if site is None:
+                site = f"{module}.{frame.f_code.co_name}"
+        frame = frame.f_back
+    return site or "unknown"
+
+
+def enable_command_stats(path):
+    # instruments all connections, nothing is patched (no overhead) unless this is called
+    stats = _CommandStats(path)
+    write_command = _Connection._write_command
+    read_line = _Connection._read_line
+    read_chunk = _Connection._read_chunk
+
+    def record(connection):
+        if connection._stats_pending is not None:
+            command, site, start, received = connection._stats_pending
+            connection._stats_pending = None
+            stats.record(
+                command,
+                site,
+                (time.perf_counter() - start) * 1000,
+                connection._stats_received - received,
+            )
+
+    def _write_command(self, command, args=[]):
+        if command in ("idle", "noidle", "command_list_begin", "command_list_ok_begin"):
+            self._stats_pending = None
+            self._stats_list_command = None
+        elif self._command_list is not None and command != "command_list_end":
+            if self._stats_list_command is None:  # first command names the list
+                self._stats_list_command = command
+        else:
+            name = command
+            if command == "command_list_end":
+                name = f"command_list:{self._stats_list_command}"
+            self._stats_pending = (
+                name,
+                _get_calling_site(sys._getframe(1)),
+                time.perf_counter(),
+                self._stats_received,
+            )
+        write_command(self, command, args)
+
+    def _read_line(self):
+        try:
+            line = read_line(self)
+        except MPDBase.CommandError:
+            record(self)
+            raise
+        if line is None:
+            if self._command_list is None:  # end of response
+                record(self)
+        else:
+            self._stats_received += len(line.encode()) + 1
+        return line
+
+    def _read_chunk(self, amount):
+        chunk = read_chunk(self, amount)
+        self._stats_received += len(chunk)
+        return chunk
+
+    _Connection._stats_pending = None
+    _Connection._stats_list_command = None
+    _Connection._stats_received = 0
+    _Connection._write_command = _write_command
+    _Connection._read_line = _read_line
+    _Connection._read_chunk = _read_chunk
+    return stats
+
+
+class _ConnectionPool:
+    # authenticated connections to the active profile for background threads
+    def __init__(self, size, max_idle_time, response_cache):
+        self._response_cache = response_cache
+        self._semaphore = threading.BoundedSemaphore(size)
+        self._lock = threading.Lock()
+        self._max_idle_time = max_idle_time
+        self._connections = []  # (connection, time of last use)
+        self._connection_args = None
+        self._generation = 0
+
+    def reset(self, connection_args):
+        with self._lock:
+            self._connection_args = connection_args
+            self._generation += 1
+            connections = self._connections
+            self._connections = []
+        for connection, last_use in connections:
+            connection.disconnect()
+
+    @contextlib.contextmanager
+    def connection(self):
+        with self._semaphore:
+            with self._lock:
+                if self._connection_args is None:
+                    raise MPDBase.ConnectionError("Not connected")
+                connection_args = self._connection_args
+                generation = self._generation
+                connection = None
+                while self._connections and connection is None:
+                    connection, last_use = self._connections.pop()
+                    # mpd drops silent clients after "connection_timeout"
+                    if time.monotonic() - last_use > self._max_idle_time:
+                        connection.disconnect()
+                        connection = None
+            if connection is None:
+                connection = _Connection(self._response_cache)
+                connection.connect_to(*connection_args)
+            try:
+                yield connection
+            except:
+                connection.disconnect()  # connection may be in an undefined state
+                raise
+            with self._lock:
+                if generation == self._generation and connection._sock is not None:
+                    self._connections.append((connection, time.monotonic()))
+                    connection = None
+            if connection is not None:
+                connection.disconnect()
+
+
+class _AsyncWorker(threading.Thread):
+    # runs queries on a pooled connection and passes the results to the main loop
+    def __init__(self, pool):
+        super().__init__(daemon=True)
+        self._pool = pool
+        self._jobs = queue.Queue()
+
+    def run_async(self, func, callback, *args):
+        self._jobs.put((func, args, callback))
+
+    def run(self):
+        while True:
+            func, args, callback = self._jobs.get()
+            try:
+                with self._pool.connection() as connection:
+                    result = func(connection, *args)
+            except Exception as e:  # handle exceptions to keep the worker alive
+                print(e)
+                continue
+            GLib.idle_add(callback, result)
+
+
+class Client(_Connection):
+    # the main thread never blocks longer than the "timeout" setting
+    COMMAND_TIMEOUTS = {}
+
+    def __init__(self, settings):
+        super().__init__(_ResponseCache(128))
+        self._settings = settings
+        self.emitter = _EventEmitter()
+        self._status = _Status()
+        self._current_song = None  # (songid, playlist version, db_update), song
+        self._last_traffic_time = 0
+        self._reconnect_timeout_id = None
+        self._reconnect_attempts = 0
+        self._reconnect_max_delay = 60
+        self._resync = False  # state of the lost connection is kept for a resync
+        self._resync_deadline = 0
+        self._resync_time_limit = 60
+        self._connect_generation = 0  # results of older connects are dropped
+        self._refresh_interval = self._settings.get_int("refresh-interval")
+        # mpd drops silent clients after "connection_timeout" (default 60s)
+        self._keep_alive_interval = 30
+        self._idle_client = _IdleClient()
+        # one connection for each user: album loading, cover loading, search,
+        # library build and "run_async", none of them has to wait for a free one
+        self._pool = _ConnectionPool(5, self._keep_alive_interval, self._response_cache)
+        self._async_worker = _AsyncWorker(self._pool)
+        self._async_worker.start()
+        self._idle_watch_id = None
+        self._elapsed_timeout_id = None
+        self._keep_alive_timeout_id = None
+        self._library = None
+        self._library_path = None
+        self._library_building = False
+        self.lib_path = None
+
+        # connect
+        self._settings.connect(
+            "changed::active-profile", self._on_active_profile_changed
+        )
+
+    def run_async(self, func, callback, *args):
+        # "func" gets called with a separate connection and "args" in a worker thread,
+        # "callback" gets called with the result in the main thread
+        self._async_worker.run_async(func, callback, *args)
+
+    def cache_info(self):  # statistics of the response cache for list, find and count
+        return self._response_cache.info()
+
+    def get_status(self):  # status of the last poll of the main loop
+        return self._status
+
+    def refresh_status(self):  # polls and emits the changes, needed for fresh data
+        if not self._main_loop():
+            raise MPDBase.ConnectionError("Connection lost")
+        return self._status
+
+    def get_current_song(self):  # fetched once per song, playlist or database change
+        key = (
+            self._status.get("songid"),
+            self._status.get("playlist"),
+            self._response_cache.get_db_update(),
+        )
+        if self._current_song is None or self._current_song[0] != key:
+            self._current_song = (key, self.currentsong())
+        return self._current_song[1]
+
+    def background_connection(self):
+        # context manager which checks out a pooled connection for use in background threads
+        return self._pool.connection()
 
     def start(self):
+        self._cancel_reconnect()
+        self._start()
+
+    def _start(self):
         self.emitter.emit("disconnected")  # bring player in defined state
+        self._connect(self._on_started)
+
+    def _on_started(self, success):
+        if success:
+            self.emitter.emit("reconnected")
+            self._main_loop()  # initial state
+            return
+        self.emitter.emit("connection_error")
+        if self._reconnect_attempts > 0:  # started by an automatic reconnect
+            self._schedule_reconnect()
+
+    def _connect(self, callback, *args):
+        # connecting blocks up to the timeout, so it's done in a worker thread,
+        # "callback" gets called with the success and "args" in the main thread
         profile = self._settings.get_active_profile()
         if profile.get_boolean("socket-connection"):
             socket = profile.get_string("socket")
             if not socket:
                 socket = FALLBACK_SOCKET
-            args = (socket, None)
+            address = (socket, None)
+            lib_path = None  # asked from mpd
         else:
-            args = (profile.get_string("host"), profile.get_int("port"))
+            address = (profile.get_string("host"), profile.get_int("port"))
+            lib_path = profile.get_string("path")
+            if not lib_path:
+                lib_path = FALLBACK_LIB
+        connection_args = (
+            address,
+            profile.get_string("password"),
+            self._settings.get_int("timeout"),
+        )
+        self._connect_generation += 1
+        threading.Thread(
+            target=self._connect_thread,
+            args=(self._connect_generation, connection_args, lib_path, callback, args),
+            daemon=True,
+        ).start()
+
+    def _connect_thread(
+        self, generation, connection_args, lib_path, callback, args
+    ):  # runs in background thread
+        connection = _Connection(self._response_cache)
+        idle_client = _IdleClient()
+        result = None
         try:
-            self.connect(*args)
-            if profile.get_string("password"):
-                self.password(profile.get_string("password"))
-        except:
-            self.emitter.emit("connection_error")
+            connection.connect_to(*connection_args)
+            if "status" in connection.capabilities.commands:
+                if lib_path is None:
+                    lib_path = connection.config()
+                db_update = connection.stats().get("db_update")
+                idle_client.connect_to(*connection_args)
+                idle_client.send_idle()
+                result = (connection, idle_client, lib_path, db_update)
+            else:
+                print("No read permission, check your mpd config.")
+        except Exception:  # reported by "connection_error"
+            pass
+        if result is None:
+            connection.disconnect()
+            idle_client.disconnect()
+        GLib.idle_add(
+            self._on_connect_thread_done,
+            generation,
+            connection_args,
+            result,
+            callback,
+            args,
+        )
+
+    def _on_connect_thread_done(
+        self, generation, connection_args, result, callback, args
+    ):
+        if generation != self._connect_generation:  # another connect was started
+            if result is not None:
+                result[0].disconnect()
+                result[1].disconnect()
             return False
-        # connect successful
-        if profile.get_boolean("socket-connection"):
-            self.lib_path = self.config()
-        else:
-            self.lib_path = self._settings.get_active_profile().get_string("path")
-            if not self.lib_path:
-                self.lib_path = FALLBACK_LIB
-        if "status" in self.commands():
-            self._main_timeout_id = GLib.timeout_add(
-                self._refresh_interval, self._main_loop
-            )
-            self.emitter.emit("reconnected")
-            return True
-        else:
-            self.disconnect()
-            self.emitter.emit("connection_error")
-            print("No read permission, check your mpd config.")
+        if result is None:
+            callback(False, *args)
             return False
+        connection, self._idle_client, self.lib_path, db_update = result
+        self._take_over(connection)
+        self._idle_watch_id = GLib.io_add_watch(
+            self._idle_client.fileno(),
+            GLib.PRIORITY_DEFAULT,
+            GLib.IOCondition.IN | GLib.IOCondition.HUP | GLib.IOCondition.ERR,
+            self._on_idle,
+        )
+        self._pool.reset(connection_args)
+        if db_update != self._response_cache.get_db_update():
+            self._response_cache.reset(db_update)
+        self._library_path = _get_library_path(connection_args[0])
+        self._update_library()
+        self._keep_alive_timeout_id = GLib.timeout_add_seconds(
+            self._keep_alive_interval, self._keep_alive
+        )
+        self._last_traffic_time = GLib.get_monotonic_time()
+        callback(True, *args)
+        return False
+
+    def _stop_main_loop(self, keep_state=False):
+        for source_id in (
+            self._idle_watch_id,
+            self._elapsed_timeout_id,
+            self._keep_alive_timeout_id,
+        ):
+            if source_id is not None:
+                GLib.source_remove(source_id)
+        self._idle_watch_id = None
+        self._elapsed_timeout_id = None
+        self._keep_alive_timeout_id = None
+        self._idle_client.disconnect()
+        self._pool.reset(None)
+        if keep_state:
+            return
+        self._response_cache.reset(None)
+        self._library = None
+        self._status = _Status()
+        self._current_song = None
 
     def reconnect(self):
-        if self._main_timeout_id is not None:
-            GLib.source_remove(self._main_timeout_id)
-            self._main_timeout_id = None
-        self._last_status = {}
+        self._stop_main_loop()
         self.disconnect()
         self.start()
 
     def connected(self):
-        try:
-            self.ping()
-            return True
-        except:
+        # answered from the state of the main loop, silent connections get probed
+        if self._idle_watch_id is None or self._sock is None:
             return False
+        silence = GLib.get_monotonic_time() - self._last_traffic_time
+        if silence > self._keep_alive_interval * 1000000:
+            try:
+                self.ping()
+            except (MPDBase.MPDError, OSError):
+                return False
+            self._last_traffic_time = GLib.get_monotonic_time()
+        return True
 
     def _to_playlist(
         self, append, mode="default"
@@ -322,29 +1342,30 @@ class Client(MPDClient):
             append()
             self.play()
         elif mode == "enqueue":
-            status = self.status()
+            status = self.refresh_status()
             if status["state"] == "stop":
                 self.clear()
                 append()
-            else:
-                self.moveid(status["songid"], 0)
-                current_song_file = self.currentsong()["file"]
-                try:
-                    self.delete(
-                        (1,)
-                    )  # delete all songs, but the first. bad song index possible
-                except MPDBase.CommandError:
-                    pass
+            else:  # keep the current song and replace all others
+                song = int(status["song"])
+                self.command_list_ok_begin()
+                if song + 1 < int(status["playlistlength"]):
+                    self.delete((song + 1,))
+                if song > 0:
+                    self.delete((0, song))
+                self.playlistid(status["songid"])
+                current_song_file = self.command_list_end()[-1][0]["file"]
                 append()
                 duplicates = self.playlistfind("file", current_song_file)
-                if len(duplicates) > 1:
-                    self.move(0, duplicates[1]["pos"])
-                    self.delete(int(duplicates[1]["pos"]) - 1)
+                if len(duplicates) > 1:  # current song takes the place of its duplicate
+                    self.command_list_ok_begin()
+                    self.deleteid(duplicates[1]["id"])
+                    self.moveid(status["songid"], int(duplicates[1]["pos"]) - 1)
+                    self.command_list_end()
 
     def files_to_playlist(self, files, mode="default"):
         def append():
-            for f in files:
-                self.add(f)
+            self.command_list("add", [(f,) for f in files])
 
         self._to_playlist(append, mode)
 
@@ -376,33 +1397,15 @@ class Client(MPDClient):
 
     def artist_to_playlist(self, artist, genre, mode="default"):
         def append():
-            if genre is None:
-                genre_filter = ()
-            else:
-                genre_filter = ("genre", genre)
-            if artist is None:
-                artists = self.get_artists(genre)
-            else:
-                artists = [artist]
-            for albumartist, albumartistsort in artists:
-                albums = self.list(
-                    "album",
-                    "albumartist",
-                    albumartist,
-                    "albumartistsort",
-                    albumartistsort,
-                    *genre_filter,
-                    "group",
-                    "date",
-                    "group",
-                    "albumsort",
-                )
-                for album in albums:
-                    self.findadd(
+            albums = self.get_all_albums(genre, artist)
+            self.command_list(
+                "findadd",
+                [
+                    (
                         "albumartist",
-                        albumartist,
+                        album["albumartist"],
                         "albumartistsort",
-                        albumartistsort,
+                        album["albumartistsort"],
                         "album",
                         album["album"],
                         "albumsort",
@@ -410,29 +1413,38 @@ class Client(MPDClient):
                         "date",
                         album["date"],
                     )
+                    for album in albums
+                ],
+            )
 
         self._to_playlist(append, mode)
 
-    def comp_list(self, *args):  # simulates listing behavior of python-mpd2 1.0
-        native_list = self.list(*args)
-        if len(native_list) > 0:
-            if isinstance(native_list[0], dict):
-                return [l[args[0]] for l in native_list]
-            else:
-                return native_list
-        else:
-            return []
+    def get_genres(self):
+        if self._library is None:
+            return super().get_genres()
+        return self._library.get_genres()
 
     def get_artists(self, genre):
-        if genre is None:
-            artists = self.list("albumartist", "group", "albumartistsort")
-        else:
-            artists = self.list(
-                "albumartist", "genre", genre, "group", "albumartistsort"
-            )
-        return [
-            (artist["albumartist"], artist["albumartistsort"]) for artist in artists
-        ]
+        if self._library is None:
+            return super().get_artists(genre)
+        return self._library.get_artists(genre)
+
+    def get_albums(self, albumartist, albumartistsort, genre, connection=None):
+        # may be called from background threads with their own "connection"
+        library = self._library
+        if library is not None:
+            return library.get_albums(albumartist, albumartistsort, genre)
+        if connection is None:
+            connection = self
+        return _Connection.get_albums(connection, albumartist, albumartistsort, genre)
+
+    def get_all_albums(self, genre, artist=None, connection=None):
+        library = self._library
+        if library is not None:
+            return library.get_all_albums(genre, artist)
+        if connection is None:
+            connection = self
+        return _Connection.get_all_albums(connection, genre, artist)
 
     def get_cover_path(self, song):
         path = None
@@ -464,20 +1476,14 @@ class Client(MPDClient):
                         break
         return path
 
-    def get_cover_binary(self, uri):
-        try:
-            binary = self.albumart(uri)["binary"]
-        except:
-            try:
-                binary = self.readpicture(uri)["binary"]
-            except:
-                binary = None
-        return binary
-
-    def get_cover(self, song):
+    def get_cover(
+        self, song, connection=None
+    ):  # "connection" is needed in background threads
+        if connection is None:
+            connection = self
         cover_path = self.get_cover_path(song)
         if cover_path is None:
-            cover_binary = self.get_cover_binary(song["file"])
+            cover_binary = connection.get_cover_binary(song["file"])
             if cover_binary is None:
                 cover = _FileCover(FALLBACK_COVER)
             else:
@@ -497,10 +1503,10 @@ class Client(MPDClient):
             return None
 
     def toggle_play(self):
-        status = self.status()
-        if status["state"] == "play":
+        state = self._status.get("state")
+        if state == "play":
             self.pause(1)
-        elif status["state"] == "pause":
+        elif state == "pause":
             self.pause(0)
         else:
             try:
@@ -509,7 +1515,7 @@ class Client(MPDClient):
                 pass
 
     def toggle_option(self, option):  # repeat, random, single, consume
-        new_state = int(self.status()[option] == "0")
+        new_state = int(self._status.get(option) == "0")
         func = getattr(self, option)
         func(new_state)
 
@@ -518,25 +1524,166 @@ class Client(MPDClient):
             double_click_time = Gtk.Settings.get_default().get_property(
                 "gtk-double-click-time"
             )
-            status = self.status()
-            if float(status.get("elapsed", 0)) * 1000 > double_click_time:
+            if self._status.get_elapsed() * 1000 > double_click_time:
                 self.seekcur(0)
             else:
                 self.previous()
         else:
             self.previous()
 
-    def restrict_tagtypes(self, *tags):
-        self.command_list_ok_begin()
-        self.tagtypes("clear")
-        for tag in tags:
-            self.tagtypes("enable", tag)
-        self.command_list_end()
+    def _on_idle(self, source, condition):
+        try:
+            subsystems = self._idle_client.fetch_idle()
+            self._idle_client.send_idle()
+            if "database" in subsystems:
+                self._refresh_response_cache()
+        except (MPDBase.ConnectionError, ConnectionResetError):
+            self._on_connection_lost()
+            return False
+        return self._main_loop()
+
+    def _refresh_response_cache(self):
+        db_update = self.stats().get("db_update")
+        if db_update != self._response_cache.get_db_update():
+            self._response_cache.reset(db_update)
+            self._update_library()
+
+    def _update_library(self):
+        # the library snapshot is loaded from disk or synced in the background
+        library = self._library
+        db_update = self._response_cache.get_db_update()
+        if library is not None and library.db_update == db_update:
+            return
+        self._library = None
+        if db_update is None:  # mpd has no database or never updated it
+            return
+        if not self._library_building:
+            self._library_building = True
+            threading.Thread(
+                target=self._build_library,
+                args=(self._library_path, library, db_update),
+                daemon=True,
+            ).start()
+
+    def _build_library(self, path, library, db_update):  # runs in background thread
+        if library is None:
+            library = _load_library(path)
+        if library is None or library.db_update != db_update:
+            try:
+                with self.background_connection() as connection:
+                    if library is None:
+                        library = _fetch_library(connection)
+                    else:
+                        library = _sync_library(connection, library)
+            except (MPDBase.MPDError, OSError) as e:
+                print(e)
+                library = None
+            if library is not None:
+                try:
+                    library.save(path)
+                except OSError as e:
+                    print(e)
+        GLib.idle_add(self._on_library_built, library, path)
+
+    def _on_library_built(self, library, path):
+        self._library_building = False
+        db_update = self._response_cache.get_db_update()
+        if db_update is None:  # disconnected or no database
+            return
+        if path != self._library_path:  # profile changed in the meantime
+            self._update_library()
+        elif library is not None:
+            # sync again if the database changed in the meantime
+            self._library = library
+            self._update_library()
+
+    def _elapsed_loop(self):
+        # extrapolate elapsed time locally, idle events and the keep-alive resync it
+        elapsed = self._status.get_elapsed()
+        self.emitter.emit("elapsed", elapsed, self._status.get_float("duration"))
+        return True
+
+    def _keep_alive(self):
+        return self._main_loop()
+
+    def _abandon_response(self, response):
+        # the main connection must stay usable, its responses are short
+        for item in response:
+            pass
+
+    def _on_timeout(self):
+        super()._on_timeout()
+        # the call may not have been made by the main loop
+        GLib.idle_add(self._on_connection_lost)
+
+    def _on_connection_lost(self):
+        if self._idle_watch_id is None:  # already handled
+            return False
+        # the ui keeps its state, a short interruption only needs a resync
+        self._stop_main_loop(keep_state=True)
+        self.disconnect()
+        self._resync = True
+        self._resync_deadline = (
+            GLib.get_monotonic_time() + self._resync_time_limit * 1000000
+        )
+        self._reconnect_attempts = 0
+        self.emitter.emit("connection_lost")
+        self._schedule_reconnect()
+        return False
+
+    def _schedule_reconnect(self):
+        # exponential backoff with jitter
+        delay = min(2**self._reconnect_attempts, self._reconnect_max_delay)
+        delay *= random.uniform(0.5, 1.5)
+        self._reconnect_attempts += 1
+        self._reconnect_timeout_id = GLib.timeout_add(
+            int(delay * 1000), self._on_reconnect_timeout
+        )
+
+    def _cancel_reconnect(self):
+        if self._reconnect_timeout_id is not None:
+            GLib.source_remove(self._reconnect_timeout_id)
+            self._reconnect_timeout_id = None
+        self._reconnect_attempts = 0
+        self._resync = False
+
+    def _on_reconnect_timeout(self):
+        self._reconnect_timeout_id = None
+        if self._resync:
+            self._connect(self._on_resynced, self._response_cache.get_db_update())
+        else:
+            self._start()
+        return False
+
+    def _on_resynced(self, success, db_update):
+        if success:
+            # cached data is kept if the database did not change,
+            # the main loop emits what changed while being disconnected
+            self._resync = False
+            self.emitter.emit("connection_restored")
+            self._main_loop()
+            if self._response_cache.get_db_update() != db_update:
+                self.emitter.emit("updated_db")
+            return
+        if GLib.get_monotonic_time() < self._resync_deadline:
+            self._schedule_reconnect()  # the state is kept for the next attempt
+            return
+        self._resync = False
+        self._stop_main_loop()
+        self.emitter.emit("disconnected")
+        self.emitter.emit("connection_error")
+        self._schedule_reconnect()
 
     def _main_loop(self, *args):
         try:
             status = self.status()
-            diff = set(status.items()) - set(self._last_status.items())
+            last_status = self._status
+            # update the snapshot first, handlers of the signals read it
+            self._status = _Status(
+                status, last_status.version + 1, GLib.get_monotonic_time()
+            )
+            self._last_traffic_time = self._status.time
+            diff = set(status.items()) - set(last_status.items())
             for key, val in diff:
                 if key == "elapsed":
                     if "duration" in status:
@@ -565,26 +1712,30 @@ class Client(MPDClient):
                         self.emitter.emit(key, False)
                 elif key == "updating_db":
                     self.emitter.emit("updating_db")
-            diff = set(self._last_status) - set(status)
+            diff = set(last_status.keys()) - set(status)
             for key in diff:
                 if "songid" == key:
                     self.emitter.emit("current_song")
                 elif "volume" == key:
                     self.emitter.emit("volume", -1)
                 elif "updating_db" == key:
+                    self._refresh_response_cache()
                     self.emitter.emit("updated_db")
                 elif "bitrate" == key:
                     self.emitter.emit("bitrate", None)
                 elif "audio" == key:
                     self.emitter.emit("audio", None)
-            self._last_status = status
         except (MPDBase.ConnectionError, ConnectionResetError) as e:
-            self.disconnect()
-            self._last_status = {}
-            self.emitter.emit("disconnected")
-            self.emitter.emit("connection_error")
-            self._main_timeout_id = None
+            self._on_connection_lost()
             return False
+        if status["state"] == "play":
+            if self._elapsed_timeout_id is None:
+                self._elapsed_timeout_id = GLib.timeout_add(
+                    self._refresh_interval, self._elapsed_loop
+                )
+        elif self._elapsed_timeout_id is not None:
+            GLib.source_remove(self._elapsed_timeout_id)
+            self._elapsed_timeout_id = None
         return True
 
     def _on_active_profile_changed(self, *args):
@@ -176,7 +176,7 @@ class MPRISInterface:  # TODO emit Seeked if needed
     # setter and getter
     def _get_playback_status(self):
         if self._client.connected():
-            status = self._client.status()
+            status = self._client.get_status()
             return GLib.Variant(
                 "s",
                 {"play": "Playing", "pause": "Paused", "stop": "Stopped"}[
@@ -199,7 +199,7 @@ class MPRISInterface:  # TODO emit Seeked if needed
 
     def _get_loop_status(self):
         if self._client.connected():
-            status = self._client.status()
+            status = self._client.get_status()
             if status["repeat"] == "1":
                 if status.get("single", "0") == "0":
                     return GLib.Variant("s", "Playlist")
@@ -218,7 +218,7 @@ class MPRISInterface:  # TODO emit Seeked if needed
 
     def _get_shuffle(self):
         if self._client.connected():
-            if self._client.status()["random"] == "1":
+            if self._client.get_status().get_boolean("random"):
                 return GLib.Variant("b", True)
             else:
                 return GLib.Variant("b", False)
@@ -230,7 +230,7 @@ class MPRISInterface:  # TODO emit Seeked if needed
     def _get_volume(self):
         if self._client.connected():
             return GLib.Variant(
-                "d", float(self._client.status().get("volume", 0)) / 100
+                "d", self._client.get_status().get_float("volume") / 100
             )
         return GLib.Variant("d", 0)
 
@@ -241,13 +241,13 @@ class MPRISInterface:  # TODO emit Seeked if needed
 
     def _get_position(self):
         if self._client.connected():
-            status = self._client.status()
-            return GLib.Variant("x", float(status.get("elapsed", 0)) * 1000000)
+            status = self._client.get_status()
+            return GLib.Variant("x", status.get_elapsed() * 1000000)
         return GLib.Variant("x", 0)
 
     def _get_can_next_prev(self):
         if self._client.connected():
-            status = self._client.status()
+            status = self._client.get_status()
             if status["state"] == "stop":
                 return GLib.Variant("b", False)
             else:
@@ -336,7 +336,7 @@ class MPRISInterface:  # TODO emit Seeked if needed
         self._client.seekcur(offset)
 
     def SetPosition(self, trackid, position):
-        song = self._client.currentsong()
+        song = self._client.get_current_song()
         if str(trackid).split("/")[-1] != song["id"]:
             return
         mpd_pos = position / 1000000
@@ -361,7 +361,7 @@ class MPRISInterface:  # TODO emit Seeked if needed
         Translate metadata returned by MPD to the MPRIS v2 syntax.
         http://www.freedesktop.org/wiki/Specifications/mpris-spec/metadata
         """
-        song = self._client.currentsong()
+        song = self._client.get_current_song()
         self._metadata = {}
         for tag, xesam_tag in (
             ("album", "album"),
@@ -0,0 +1,17 @@
+import importlib.util
+import os
+import sys
+import types
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), os.pardir, "src"))
+
+# mpdevil.constants is generated by meson, the tests don't need the installed paths
+if importlib.util.find_spec("mpdevil.constants") is None:
+    constants = types.ModuleType("mpdevil.constants")
+    constants.LOCALE_DIR = ""
+    constants.RESOURCES_DIR = ""
+    constants.COVER_REGEX = r"^\.?(album|cover|folder|front).*\.(gif|jpeg|jpg|png)$"
+    constants.FALLBACK_COVER = ""
+    constants.FALLBACK_SOCKET = ""
+    constants.FALLBACK_LIB = ""
+    sys.modules["mpdevil.constants"] = constants
@@ -0,0 +1,80 @@
+import socket
+import threading
+import time
+
+import pytest
+
+pytest.importorskip("gi")
+
+from mpd import base as MPDBase
+from mpdevil.mpd_client_wrapper import _Connection
+
+
+class StandInServer(threading.Thread):
+    # answers like mpd, "status" never gets a response and "update" a late one
+    def __init__(self, update_delay):
+        super().__init__(daemon=True)
+        self._update_delay = update_delay
+        self._socket = socket.socket()
+        self._socket.bind(("127.0.0.1", 0))
+        self._socket.listen()
+        self.address = self._socket.getsockname()
+
+    def run(self):
+        connection, address = self._socket.accept()
+        with connection, connection.makefile("rwb") as f:
+            f.write(b"OK MPD 0.23.0\n")
+            f.flush()
+            in_list = False
+            for line in f:
+                command = line.split()[0]
+                if command == b"command_list_ok_begin":
+                    in_list = True
+                    continue
+                elif command == b"command_list_end":
+                    in_list = False
+                    f.write(b"OK\n")
+                elif command == b"status":
+                    continue  # unresponsive
+                elif command == b"update":
+                    time.sleep(self._update_delay)
+                    f.write(b"updating_db: 1\n")
+                    f.write(b"list_OK\n" if in_list else b"OK\n")
+                else:
+                    f.write(b"list_OK\n" if in_list else b"OK\n")
+                f.flush()
+
+
+@pytest.fixture
+def connection():
+    server = StandInServer(update_delay=1.5)
+    server.start()
+    connection = _Connection()
+    connection.connect_to(server.address, None, timeout=1)
+    yield connection
+    connection.disconnect()
+
+
+def test_unresponsive_server_times_out(connection):
+    start = time.monotonic()
+    with pytest.raises(MPDBase.ConnectionError):
+        connection.status()
+    assert time.monotonic() - start < 3
+    assert connection._sock is None  # the state of the response is unknown
+
+
+def test_long_command_gets_its_own_timeout(connection, monkeypatch):
+    monkeypatch.setitem(_Connection.COMMAND_TIMEOUTS, "update", 5)
+    assert connection.update() == "1"
+    assert connection.timeout == 5
+
+
+def test_command_list_gets_longest_timeout(connection, monkeypatch):
+    monkeypatch.setitem(_Connection.COMMAND_TIMEOUTS, "update", 5)
+    connection.command_list_ok_begin()
+    connection.ping()
+    connection.update()
+    connection.ping()
+    assert connection.command_list_end()[1] == "1"
+    connection.ping()
+    assert connection.timeout == 1